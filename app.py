@@ -1,46 +1,171 @@
+import numpy as np
 import pandas as pd
-import plotly.express as px
+import pyarrow as pa
 import plotly.graph_objects as go
-from dash import Dash, dcc, html, Input, Output
+import plotly.io as pio
+import orjson
+from dash import Dash, dcc, html, Input, Output, State, Patch, ctx, no_update
 import dash_bootstrap_components as dbc
 import os
-import time
+import threading
 from functools import lru_cache
+from flask_caching import Cache
 from datetime import date
 
+# Dash serialises callback responses through plotly.io.json too, so this covers figures and all other payloads
+pio.json.config.default_engine = "orjson"
+
 CSV_PATH = "device_metrics.csv"
+ARROW_PATH = os.path.splitext(CSV_PATH)[0] + ".arrow"  # typed Arrow IPC copy written by device_simulator.py
 
 if not os.path.exists(CSV_PATH):
     raise FileNotFoundError(
         f"Expected {CSV_PATH} not found. Run device_simulator.py first to generate initial history."
     )
 
-_initial_df = pd.read_csv(CSV_PATH)
 EXPECTED_COLS = {"date", "device_id", "temperature_c", "humidity_pct", "battery_pct", "error_count", "status"}
-missing = EXPECTED_COLS - set(_initial_df.columns)
-if missing:
-    raise ValueError(f"CSV missing expected columns: {missing}")
+STATUSES = ["OK", "WARN", "ERROR", "LOW_BATTERY"]
+# Readings fit comfortably in 32-bit floats and error counts in int16; halves the bytes every scan touches
+NUMERIC_DTYPES = {"temperature_c": "float32", "humidity_pct": "float32", "battery_pct": "float32", "error_count": "int16"}
 
-_initial_df['date'] = pd.to_datetime(_initial_df['date'])
-_initial_df = _initial_df.sort_values(['device_id', 'date'])
+def _read_metrics() -> pd.DataFrame:
+    # Prefer the Arrow copy unless the CSV was edited after it was written. It is uncompressed IPC, so
+    # memory-mapping it reads the columns straight out of the page cache with no decode step.
+    if os.path.exists(ARROW_PATH) and os.path.getmtime(ARROW_PATH) >= os.path.getmtime(CSV_PATH):
+        with pa.memory_map(ARROW_PATH, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+            # Only the dashboard's columns are converted; anything else is never read from the mapping
+            return table.select([c for c in table.column_names if c in EXPECTED_COLS]).to_pandas()
+    # pyarrow's multi-threaded parser reads the ISO dates as timestamps directly. Declaring them via
+    # dtype (not parse_dates) keeps a missing column for the schema check below instead of raising here.
+    return pd.read_csv(CSV_PATH, engine='pyarrow', dtype={**NUMERIC_DTYPES, 'date': 'datetime64[ns]'})
 
-DEVICE_IDS = sorted(_initial_df['device_id'].unique().tolist())
-DEFAULT_DEVICE = DEVICE_IDS[0]
+def _prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # Both readers already yield datetimes, so no parsing is left here.
+    # Daily dates: seconds are the coarsest unit pandas keeps, and encode the same in figures and Patches
+    df['date'] = df['date'].astype('datetime64[s]')
+    df = df.astype(NUMERIC_DTYPES)  # no-op for CSV and simulator-written Arrow reads
+    # Low-cardinality columns as categoricals so isin/groupby run on integer codes
+    df['status'] = pd.Categorical(df['status'], categories=STATUSES)
+    df['device_id'] = df['device_id'].astype('category')
+    # device_simulator.py writes rows in (device_id, date) order; an O(N) check avoids re-sorting them
+    device_step = np.diff(df['device_id'].cat.codes.to_numpy())
+    date_step = np.diff(df['date'].to_numpy())
+    if (device_step >= 0).all() and ((device_step > 0) | (date_step >= np.timedelta64(0))).all():
+        return df
+    return df.sort_values(['device_id', 'date'])
 
-CACHE_TTL = 30  # seconds
+def _data_version() -> float:
+    # Newest mtime of the data files; unchanged files mean there is nothing to reload
+    return max(os.path.getmtime(p) for p in (CSV_PATH, ARROW_PATH) if os.path.exists(p))
 
 @lru_cache(maxsize=1)
-def _cached_load(ts_bucket: int):  # ts_bucket changes every CACHE_TTL seconds
-    df = pd.read_csv(CSV_PATH)
+def _bootstrap():
+    # First validated load, kept off the import path (warmed by a background thread below).
+    # Returns (version, frame); later reloads fall back to this frame if a rewrite breaks the schema.
+    version = _data_version()
+    df = _read_metrics()
+    missing = EXPECTED_COLS - set(df.columns)
+    if missing:
+        raise ValueError(f"CSV missing expected columns: {missing}")
+    return version, _prepare_frame(df)
+
+@lru_cache(maxsize=1)
+def _cached_load(version: float):  # version is the data files' mtime, see _data_version
+    boot_version, boot_df = _bootstrap()
+    if version == boot_version:
+        return boot_df
+    df = _read_metrics()
     # Basic schema guard (silent skip if already validated)
     if EXPECTED_COLS - set(df.columns):
-        return _initial_df
-    df['date'] = pd.to_datetime(df['date'])
-    return df.sort_values(['device_id', 'date'])
+        return boot_df
+    return _prepare_frame(df)
+
+@lru_cache(maxsize=1)
+def _cached_latest(version: float):
+    df = _cached_load(version)
+    # Frame is sorted by (device_id, date), so each device's newest reading is the row where the
+    # device code changes next (or the final row); the append sentinel never matches a real code
+    codes = df['device_id'].cat.codes.to_numpy()
+    last_rows = np.flatnonzero(np.diff(codes, append=-2) != 0)
+    return df.take(last_rows).reset_index(drop=True)
+
+@lru_cache(maxsize=1)
+def _cached_device_arrays(version: float):
+    # Struct-of-arrays per device: callbacks index plain ndarrays instead of masking frames.
+    # status is kept as its categorical codes (positions in STATUSES).
+    return {
+        d: {'status': g['status'].cat.codes.to_numpy(), **{c: g[c].to_numpy() for c in ('date', *NUMERIC_DTYPES)}}
+        for d, g in _cached_load(version).groupby('device_id', sort=False, observed=True)
+    }
+
+@lru_cache(maxsize=1)
+def _cached_kpis(version: float):
+    latest = _cached_latest(version)
+    if latest.empty:
+        return "-", "-", "-", "-"
+    # One fused reduction over the latest rows instead of four separate column passes
+    agg = latest.agg({'temperature_c': 'mean', 'humidity_pct': 'mean', 'battery_pct': 'mean', 'error_count': 'sum'})
+    return (
+        f"{agg['temperature_c']:.1f}",
+        f"{agg['humidity_pct']:.1f}",
+        f"{agg['battery_pct']:.1f}",
+        f"{int(agg['error_count'])}"
+    )
+
+@lru_cache(maxsize=1)
+def _cached_status_summary(version: float):
+    latest = _cached_latest(version)
+    # status is categorical over STATUSES, so unsorted counts already list every status in order, zeros included
+    counts = latest['status'].value_counts(sort=False)
+    return {
+        "total": len(latest),
+        "counts": dict(zip(STATUSES, counts.tolist())),
+        "last_date": latest['date'].max().date().isoformat() if len(latest) else "-",
+    }
+
+@lru_cache(maxsize=1)
+def _cached_device_labels(version: float):
+    return tuple(f"Device {d}" for d in _cached_load(version)['device_id'].cat.categories.tolist())
+
+@lru_cache(maxsize=1)
+def _cached_device_options(version: float):
+    ids = _cached_load(version)['device_id'].cat.categories.tolist()
+    return tuple({"label": label, "value": d} for label, d in zip(_cached_device_labels(version), ids))
+
+def load_device_options():
+    return _cached_device_options(_data_version())
+
+# Warm the first load in the background so importing the app does not block on reading the data
+threading.Thread(target=_bootstrap, daemon=True).start()
+
+def _status_codes(statuses) -> list:
+    return [STATUSES.index(s) for s in statuses if s in STATUSES]
+MAX_TIMESERIES_POINTS = 2000  # roughly 2x the plot width in pixels; more points are not visible
+SCATTERGL_MIN_POINTS = 1000  # below this SVG draws fast enough and avoids holding a WebGL context
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of n_out points that preserve the visual shape of (x, y)."""
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # First and last points are always kept; the interior is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Third triangle vertex is the mean of the next bucket (just the last point for the final bucket)
+        nhi = edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[hi:nhi].mean(), y[hi:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
 
-def load_dataframe():
-    ts_bucket = int(time.time() // CACHE_TTL)
-    return _cached_load(ts_bucket)
 METRICS = [
     {"label": "Temperature (C)", "value": "temperature_c"},
     {"label": "Humidity (%)", "value": "humidity_pct"},
@@ -59,13 +184,56 @@ STATUS_COLORS = {
     "ERROR": "#ef4444",     # Error color - meets WCAG AA contrast
     "LOW_BATTERY": "#3b82f6",  # Info color - meets WCAG AA contrast
 }
+# Marker colour per status code (position in STATUSES), so colouring a trace is one array gather
+STATUS_COLOR_LUT = np.array([STATUS_COLORS[s] for s in STATUSES])
+# Layout shared by every timeseries figure; built once instead of on each callback
+TIMESERIES_LAYOUT = dict(
+    template="plotly_dark",
+    plot_bgcolor="rgba(17, 24, 39, 0.8)",  # Subtle background
+    paper_bgcolor="rgba(0, 0, 0, 0)",
+    font=dict(
+        family="Inter, -apple-system, BlinkMacSystemFont, 'Segoe UI', system-ui, sans-serif",
+        color="#d1d5db",  # Accessible text color
+        size=13
+    ),
+    height=420,
+    margin=dict(t=60, b=50, l=60, r=30),
+    xaxis=dict(
+        gridcolor="rgba(156, 163, 175, 0.1)",
+        gridwidth=1,
+        showgrid=True
+    ),
+    yaxis=dict(
+        gridcolor="rgba(156, 163, 175, 0.1)",
+        gridwidth=1,
+        showgrid=True
+    )
+)
+# Layout of the battery overview: the timeseries styling plus its fixed titles and axes
+BATTERY_LAYOUT = dict(
+    TIMESERIES_LAYOUT,
+    title='Latest Battery Levels by Device',
+    barmode='relative',
+    uirevision='battery-overview',
+    legend_title_text='status',
+    xaxis=dict(TIMESERIES_LAYOUT["xaxis"], showgrid=False, title="Device", categoryorder="array"),
+    yaxis=dict(TIMESERIES_LAYOUT["yaxis"], title="Battery (%)", ticksuffix="%"),
+)
 
 # --------------------------------------------------
 # 2.  DASH APP  &  CUSTOM CSS
 # --------------------------------------------------
 
-app = Dash(__name__, external_stylesheets=[dbc.themes.SUPERHERO, 'https://use.fontawesome.com/releases/v5.15.4/css/all.css'])
+# serve_locally=False loads the Dash/plotly.js bundles from the public CDN (like the stylesheets), so
+# browsers can reuse a cached copy and the app server does not stream the multi-MB plotly bundle itself
+app = Dash(
+    __name__,
+    external_stylesheets=[dbc.themes.SUPERHERO, 'https://use.fontawesome.com/releases/v5.15.4/css/all.css'],
+    serve_locally=False,
+)
 server = app.server
+# Per-process figure cache; keys include the data version, so entries never need to expire
+cache = Cache(server, config={"CACHE_TYPE": "SimpleCache", "CACHE_DEFAULT_TIMEOUT": 0})
 
 app.index_string = """
 <!DOCTYPE html>
@@ -690,6 +858,10 @@ app.index_string = """
 app.layout = dbc.Container(
     [
         dcc.Interval(id="auto-refresh", interval=60*1000, n_intervals=0),  # 60s refresh
+        dcc.Store(id="data-version"),  # {version, previous}: data files' mtime, only changes with new data
+        dcc.Store(id="timeseries-drawn"),  # selection + data version of the timeseries currently on screen
+        dcc.Store(id="battery-figure"),  # all-status battery figure, filtered by status in the browser
+        dcc.Store(id="latest-summary"),  # status counts + KPI strings of the latest rows, rendered clientside
         # ---------- HEADER ----------
         dbc.Row(
             dbc.Col(
@@ -741,8 +913,7 @@ app.layout = dbc.Container(
                         html.Div([
                             html.Div([html.I(className="fas fa-hdd"), html.Span("Device:")], className="control-label"),
                             dcc.Dropdown(
-                                options=[{"label": f"Device {d}", "value": d} for d in DEVICE_IDS],
-                                value=DEFAULT_DEVICE,
+                                options=[],  # filled by update_device_options once the data is loaded
                                 id="device-select",
                                 clearable=False,
                             ),
@@ -841,144 +1012,270 @@ app.layout = dbc.Container(
 # --------------------------------------------------
 # 4.  CALLBACKS
 # --------------------------------------------------
-@app.callback(
-    Output("metric-timeseries", "figure"),
-    [Input("device-select", "value"), Input("metric-select", "value"), Input("status-filter", "value"), Input("auto-refresh", "n_intervals")]
-)
-def update_metric_timeseries(device_id, metric, statuses, _n):
-    df = load_dataframe()
-    device_df = df[df['device_id'] == device_id]
-    device_df = device_df[device_df['status'].isin(statuses)]
-    if device_df.empty:
-        fig = go.Figure()
-        fig.update_layout(title="No data for selection", template="plotly_dark")
-        return fig
+def _metric_text(metric):
+    """Per-metric strings of the timeseries figure: (meta, hovertemplate, y-axis tick suffix)."""
     meta = METRIC_META.get(metric, {"label": metric, "unit": "", "decimals": 2})
-    fig = px.line(device_df, x='date', y=metric, title=f"Device {device_id}: {meta['label']} over Time")
-    fig.update_traces(
-        mode='lines+markers', 
-        marker=dict(size=8, line=dict(width=2, color="#1f2937")),
-        line=dict(width=3, color="#3b82f6"),  # Accessible blue
-        connectgaps=True
-    )
-    # Hover formatting
-    decimals = meta['decimals']
     unit = meta['unit']
     hover_tmpl = (
-        f"<b>{{{{x|%b %d, %Y}}}}</b><br>{meta['label']}: {{{{y:.{decimals}f}}}}{unit}<extra></extra>"
+        f"<b>{{{{x|%b %d, %Y}}}}</b><br>{meta['label']}: {{{{y:.{meta['decimals']}f}}}}{unit}<extra></extra>"
     )
-    fig.update_traces(hovertemplate=hover_tmpl)
+    return meta, hover_tmpl, (unit if unit in ["%","°C"] else None)
+
+def _series_values(values: np.ndarray) -> list:
+    """A metric column as the list of numbers the figure JSON carries, shared by full figures and Patches."""
+    if values.dtype.kind in 'iu':
+        return values.tolist()
+    # tolist() would widen float32 to its exact float64 (23.4 -> 23.399999618530273); orjson writes each
+    # float32 as its shortest round-tripping decimal, which reads back as the float64 nearest to it
+    return orjson.loads(orjson.dumps(values, option=orjson.OPT_SERIALIZE_NUMPY))
+
+@cache.memoize()
+def _build_timeseries_figure(device_id, metric, statuses: tuple, version: float) -> dict:
+    # The version the callback took, not a fresh stat, so the memoised entry matches its key
+    arrays = _cached_device_arrays(version).get(device_id)
+    mask = np.isin(arrays['status'], _status_codes(statuses)) if arrays is not None else None
+    if mask is None or not mask.any():
+        fig = go.Figure()
+        fig.update_layout(title="No data for selection", template="plotly_dark")
+        return fig.to_dict()
+    meta, hover_tmpl, ticksuffix = _metric_text(metric)
+    unit = meta['unit']
+    # graph_objects + raw arrays skip Plotly Express' frame copy; WebGL keeps long histories responsive
+    x = arrays['date'][mask]
+    y = arrays[metric][mask]
+    codes = arrays['status'][mask]
+    if len(x) > MAX_TIMESERIES_POINTS:
+        idx = _lttb_indices(x.view(np.int64), y, MAX_TIMESERIES_POINTS)
+        x, y, codes = x[idx], y[idx], codes[idx]
+    trace = go.Scattergl if len(x) >= SCATTERGL_MIN_POINTS else go.Scatter
+    fig = go.Figure(trace(
+        x=x,
+        y=_series_values(y),
+        mode='lines+markers',
+        marker=dict(size=8, color=STATUS_COLOR_LUT[codes].tolist(), line=dict(width=2, color="#1f2937")),
+        line=dict(width=3, color="#3b82f6"),  # Accessible blue
+        connectgaps=True,
+        hovertemplate=hover_tmpl,
+    ))
     fig.update_layout(
-        template="plotly_dark",
-        plot_bgcolor="rgba(17, 24, 39, 0.8)",  # Subtle background
-        paper_bgcolor="rgba(0, 0, 0, 0)",
-        font=dict(
-            family="Inter, -apple-system, BlinkMacSystemFont, 'Segoe UI', system-ui, sans-serif",
-            color="#d1d5db",  # Accessible text color
-            size=13
-        ),
-        height=420,
-        margin=dict(t=60, b=50, l=60, r=30),
-        xaxis=dict(
-            gridcolor="rgba(156, 163, 175, 0.1)",
-            gridwidth=1,
-            showgrid=True
-        ),
-        yaxis=dict(
-            gridcolor="rgba(156, 163, 175, 0.1)", 
-            gridwidth=1,
-            showgrid=True
-        )
+        TIMESERIES_LAYOUT,
+        title=f"Device {device_id}: {meta['label']} over Time",
+        uirevision=f"{device_id}:{metric}",  # keep zoom/pan across refreshes until the selection changes
     )
     yaxis_title = meta['label']
     if unit and unit not in yaxis_title:
         yaxis_title = f"{yaxis_title}"
-    fig.update_yaxes(title=yaxis_title, ticksuffix=(unit if unit in ["%","°C"] else None))
+    fig.update_yaxes(title=yaxis_title, ticksuffix=ticksuffix)
     fig.update_xaxes(tickformat="%b %d", title="Date")
-    return fig
+    return fig.to_dict()
+
+def _timeseries_metric_patch(device_id, metric, statuses: tuple, version: float):
+    """Patch that swaps the plotted metric in place, or None when the figure needs a full rebuild."""
+    arrays = _cached_device_arrays(version).get(device_id)
+    mask = np.isin(arrays['status'], _status_codes(statuses)) if arrays is not None else None
+    # Downsampled series pick their points from y, so x and the marker colours would change as well
+    if mask is None or not mask.any() or np.count_nonzero(mask) > MAX_TIMESERIES_POINTS:
+        return None
+    meta, hover_tmpl, ticksuffix = _metric_text(metric)
+    patch = Patch()
+    patch['data'][0]['y'] = _series_values(arrays[metric][mask])
+    patch['data'][0]['hovertemplate'] = hover_tmpl
+    patch['layout']['title']['text'] = f"Device {device_id}: {meta['label']} over Time"
+    patch['layout']['uirevision'] = f"{device_id}:{metric}"
+    patch['layout']['yaxis']['title']['text'] = meta['label']
+    patch['layout']['yaxis']['ticksuffix'] = ticksuffix
+    return patch
+
+def _timeseries_extend_patch(prev: dict, fig: dict):
+    """Patch appending fig's new points to prev, or None unless prev's points are an unchanged prefix of fig."""
+    if not prev['data']:
+        return None
+    old, new = prev['data'][0], fig['data'][0]
+    n = len(old['x'])
+    # A downsampled series, a rewritten day or a switch to WebGL all change more than the tail
+    if new['type'] != old['type'] or len(new['x']) < n:
+        return None
+    if not (np.array_equal(new['x'][:n], old['x']) and new['y'][:n] == old['y']
+            and new['marker']['color'][:n] == old['marker']['color']):
+        return None
+    patch = Patch()
+    patch['data'][0]['x'].extend(new['x'][n:].tolist())
+    patch['data'][0]['y'].extend(new['y'][n:])
+    patch['data'][0]['marker']['color'].extend(new['marker']['color'][n:])
+    return patch
+
+@cache.memoize()
+def _build_battery_figure(version: float) -> dict:
+    # Rows and labels of the memoised version rather than fresh stats, so device_id codes index its labels
+    latest = _cached_latest(version)
+    latest = latest[latest['status'].notna()]
+    # float64 copies of the shortest float32 decimals, so the bars send 43.6 as the timeseries does
+    latest = latest.assign(battery_pct=np.array(_series_values(latest['battery_pct'].to_numpy())))
+    labels = _cached_device_labels(version)
+    latest = latest.assign(device_label=np.array(labels, dtype=object)[latest['device_id'].cat.codes.to_numpy()])
+    # One trace per status keeps the colour legend and lets the browser apply the status filter by
+    # trace name; the status is baked into each trace's hover text
+    fig = go.Figure([
+        go.Bar(
+            x=group['device_label'].to_numpy(),
+            y=group['battery_pct'].to_numpy(),
+            name=status,
+            marker_color=STATUS_COLORS[status],
+            text=group['battery_pct'].to_numpy(),
+            hovertemplate=f"%{{x}}<br>Battery: %{{y:.1f}}%<br>Status: {status}<extra></extra>",
+        )
+        for status, group in latest.groupby('status', observed=True)
+    ])
+    fig.update_layout(BATTERY_LAYOUT, xaxis_categoryarray=list(labels))
+    fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+    return fig.to_dict()
+
+def _is_refresh(version) -> bool:
+    # True when new data alone fired the callback on a page that already drew every figure once
+    return bool(version) and version["previous"] is not None and set(ctx.triggered_prop_ids) == {"data-version.data"}
+
+def _refresh_patch(fig: dict):
+    """Patch replacing a figure's traces and layout except the template, which is most of the payload."""
+    patch = Patch()
+    patch['data'] = fig['data']
+    for key, value in fig['layout'].items():
+        if key != 'template':
+            patch['layout'][key] = value
+    return patch
 
 @app.callback(
-    Output("battery-overview", "figure"),
-    [Input("status-filter", "value"), Input("auto-refresh", "n_intervals")]
+    Output("data-version", "data"),
+    Input("auto-refresh", "n_intervals"),
+    State("data-version", "data")
 )
-def update_battery_overview(statuses, _n):
-    df = load_dataframe()
-    latest = df.sort_values(['device_id','date']).groupby('device_id').tail(1)
-    all_devices_df = pd.DataFrame({'device_id': DEVICE_IDS})
-    latest = all_devices_df.merge(latest, on='device_id', how='left')
-    latest = latest[latest['status'].isin(statuses)]
-    if latest.empty:
-        fig = go.Figure()
-        fig.update_layout(title="No devices match status filter", template="plotly_dark")
-        return fig
-    latest['device_label'] = latest['device_id'].apply(lambda x: f"Device {x}")
-    fig = px.bar(latest, x='device_label', y='battery_pct', color='status', title='Latest Battery Levels by Device',
-                 color_discrete_map=STATUS_COLORS, text='battery_pct', category_orders={'device_label': [f"Device {d}" for d in DEVICE_IDS]})
-    fig.update_layout(
-        template="plotly_dark",
-        plot_bgcolor="rgba(17, 24, 39, 0.8)",
-        paper_bgcolor="rgba(0, 0, 0, 0)",
-        font=dict(
-            family="Inter, -apple-system, BlinkMacSystemFont, 'Segoe UI', system-ui, sans-serif",
-            color="#d1d5db",
-            size=13
-        ),
-        height=420,
-        margin=dict(t=60, b=50, l=60, r=30),
-        xaxis=dict(
-            gridcolor="rgba(156, 163, 175, 0.1)",
-            gridwidth=1,
-            showgrid=False  
-        ),
-        yaxis=dict(
-            gridcolor="rgba(156, 163, 175, 0.1)",
-            gridwidth=1,
-            showgrid=True
-        )
-    )
-    fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside',
-                      hovertemplate="%{x}<br>Battery: %{y:.1f}%<br>Status: %{customdata}<extra></extra>",
-                      customdata=latest['status'])
-    fig.update_yaxes(title="Battery (%)", ticksuffix="%")
-    fig.update_xaxes(title="Device")
-    return fig
+def update_data_version(_n, current):
+    # Interval ticks with unchanged files stop here, so no chart or KPI callback fires.
+    # previous is None on page load, when no figure has been drawn yet (see _is_refresh).
+    version = _data_version()
+    if current and version == current["version"]:
+        return no_update
+    return {"version": version, "previous": current and current["version"]}
 
 @app.callback(
-    Output("summary-text", "children"),
-    [Input("status-filter", "value"), Input("auto-refresh", "n_intervals")]
+    [Output("device-select", "options"), Output("device-select", "value")],
+    Input("data-version", "data"),
+    [State("device-select", "value"), State("device-select", "options")]
 )
-def update_summary(statuses, _n):
-    df = load_dataframe()
-    latest = df.sort_values('date').groupby('device_id').tail(1)
-    total = len(latest)
-    counts = latest['status'].value_counts().to_dict()
-    parts = [f"{k}:{counts.get(k,0)}" for k in STATUS_COLORS.keys() if k in statuses]
-    last_date = df['date'].max().date().isoformat()
-    return f"Devices: {total} • Status breakdown (filtered): {' | '.join(parts)} • Last update day in CSV: {last_date}"
+def update_device_options(_version, current, current_options):
+    options = load_device_options()
+    # Most reloads only add readings; with the same device set there is nothing to resend
+    if current_options and [o["value"] for o in current_options] == [o["value"] for o in options]:
+        return no_update, no_update
+    device_ids = [o["value"] for o in options]
+    # Keep the user's pick across reloads; default to the first device on page load
+    value = current if current in device_ids else (device_ids[0] if device_ids else None)
+    return options, value
 
+@app.callback(
+    [Output("metric-timeseries", "figure"), Output("timeseries-drawn", "data")],
+    [Input("device-select", "value"), Input("metric-select", "value"), Input("status-filter", "value"), Input("data-version", "data")],
+    State("timeseries-drawn", "data")
+)
+def update_metric_timeseries(device_id, metric, statuses, version, drawn):
+    statuses = tuple(sorted(statuses))
+    current = _data_version()
+    now_drawn = {"selection": [device_id, metric, list(statuses)], "version": current}
+    # A metric switch keeps x and the marker colours, so only the y values and labels are sent. drawn
+    # is what the browser last applied (a superseded in-flight response never lands), so the patch is
+    # only sent when that figure is this device and filter at the current data version.
+    if (set(ctx.triggered_prop_ids) == {"metric-select.value"} and drawn and drawn["version"] == current
+            and drawn["selection"][0] == device_id and drawn["selection"][2] == list(statuses)):
+        patch = _timeseries_metric_patch(device_id, metric, statuses, current)
+        if patch is not None:
+            return patch, now_drawn
+    fig = _build_timeseries_figure(device_id, metric, statuses, current)
+    # Empty selections get the bare "No data" figure, whose layout a patch could not clear
+    if not (_is_refresh(version) and fig['data']):
+        return fig, now_drawn
+    # A daily append usually only adds points: extend the drawn trace from the figure this process
+    # built for exactly what the browser shows, and replace the traces if that is unknown or differs
+    patch = None
+    if drawn and drawn["selection"] == now_drawn["selection"]:
+        prev = cache.get(_build_timeseries_figure.make_cache_key(
+            _build_timeseries_figure.uncached, device_id, metric, statuses, drawn["version"]))
+        patch = _timeseries_extend_patch(prev, fig) if prev else None
+    return (patch if patch is not None else _refresh_patch(fig)), now_drawn
+
+@app.callback(
+    Output("battery-figure", "data"),
+    Input("data-version", "data")
+)
+def update_battery_figure(version):
+    fig = _build_battery_figure(_data_version())
+    return _refresh_patch(fig) if _is_refresh(version) else fig
+
+# Status chip toggles only hide traces of the stored all-status figure, so they never reach the server
+app.clientside_callback(
+    """
+    function(statuses, fig) {
+        if (!fig) {
+            return window.dash_clientside.no_update;
+        }
+        const selected = statuses || [];
+        const data = fig.data.filter(t => selected.includes(t.name));
+        if (!data.length) {
+            const title = {text: "No devices match status filter"};
+            return {data: [], layout: Object.assign({}, fig.layout, {title: title})};
+        }
+        return Object.assign({}, fig, {data: data});
+    }
+    """,
+    Output("battery-overview", "figure"),
+    [Input("status-filter", "value"), Input("battery-figure", "data")]
+)
 
 @app.callback(
+    Output("latest-summary", "data"),
+    Input("data-version", "data")
+)
+def update_latest_summary(_version):
+    # One round trip per data change feeds both the summary line and the KPI cards, from one data version
+    version = _data_version()
+    return {**_cached_status_summary(version), "kpis": _cached_kpis(version)}
+
+# Status chip toggles only reformat the stored counts, so the summary is composed in the browser
+app.clientside_callback(
+    """
+    function(statuses, data) {
+        if (!data) {
+            return window.dash_clientside.no_update;
+        }
+        const parts = Object.keys(data.counts)
+            .filter(k => (statuses || []).includes(k))
+            .map(k => k + ":" + data.counts[k]);
+        return "Devices: " + data.total + " • Status breakdown (filtered): " + parts.join(" | ") +
+            " • Last update day in CSV: " + data.last_date;
+    }
+    """,
+    Output("summary-text", "children"),
+    [Input("status-filter", "value"), Input("latest-summary", "data")]
+)
+
+app.clientside_callback(
+    """
+    function(data) {
+        if (!data) {
+            return Array(4).fill(window.dash_clientside.no_update);
+        }
+        return data.kpis;
+    }
+    """,
     Output("kpi-avg-temp", "children"),
     Output("kpi-avg-humidity", "children"),
     Output("kpi-avg-battery", "children"),
     Output("kpi-errors", "children"),
-    Input("auto-refresh", "n_intervals")
+    Input("latest-summary", "data")
 )
-def update_kpis(_n):
-    df = load_dataframe()
-    if df.empty:
-        return "-", "-", "-", "-"
-    latest = df.sort_values('date').groupby('device_id').tail(1)
-    return (
-        f"{latest['temperature_c'].mean():.1f}",
-        f"{latest['humidity_pct'].mean():.1f}",
-        f"{latest['battery_pct'].mean():.1f}",
-        f"{int(latest['error_count'].sum())}"
-    )
 
 
 # --------------------------------------------------
 # 5.  RUN SERVER
 # --------------------------------------------------
 if __name__ == "__main__":
+    _bootstrap()  # surface a broken data file before serving
     app.run(debug=True)
\ No newline at end of file
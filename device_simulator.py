@@ -1,8 +1,10 @@
 import argparse
+import csv
 import os
 from datetime import date, timedelta
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 
 CSV_NAME = "device_metrics.csv"
 
@@ -19,81 +21,110 @@ COLUMNS = [
 
 STATUSES = ["OK", "WARN", "ERROR", "LOW_BATTERY"]
 
+# Compact dtypes for the Arrow copy; matches what app.py works with, so loading needs no cast
+ARROW_DTYPES = {"temperature_c": "float32", "humidity_pct": "float32", "battery_pct": "float32", "error_count": "int16"}
+
 rng = np.random.default_rng()
 
-def _derive_status(battery: float, errors: int) -> str:
-    if battery < 15:
-        return "LOW_BATTERY"
-    if errors >= 3:
-        return "ERROR"
-    if errors >= 1:
-        return "WARN"
-    return "OK"
+def _derive_status(battery: np.ndarray, errors: np.ndarray) -> np.ndarray:
+    # Evaluated for whole arrays; the first matching condition wins, anything else is OK
+    return np.select([battery < 15, errors >= 3, errors >= 1], ["LOW_BATTERY", "ERROR", "WARN"], default="OK")
 
 def generate_initial_history(days: int, devices: int) -> pd.DataFrame:
     today = date.today()
-    records = []
     # Start each device with a random battery between 60-100
     starting_battery = rng.integers(60, 101, size=devices)
 
-    for d in range(days, 0, -1):
-        current_day = today - timedelta(days=d)
-        for dev in range(1, devices + 1):
-            # Simulate gradual battery drain
-            drain = rng.uniform(0.5, 2.5)
-            starting_battery[dev-1] = max(0, starting_battery[dev-1] - drain)
-            battery = starting_battery[dev-1]
-            temp = rng.normal(25, 3)
-            humidity = rng.normal(45, 5)
-            errors = rng.poisson(0.4)
-            status = _derive_status(battery, errors)
-            records.append({
-                "date": current_day.isoformat(),
-                "device_id": dev,
-                "temperature_c": round(temp, 2),
-                "humidity_pct": round(humidity, 2),
-                "battery_pct": round(battery, 1),
-                "error_count": int(errors),
-                "status": status
-            })
-    return pd.DataFrame(records)
+    # Sample every (day, device) reading at once; rows are day-major like the loop this replaced
+    shape = (days, devices)
+    drain = rng.uniform(0.5, 2.5, size=shape)
+    temp = rng.normal(25, 3, size=shape)
+    humidity = rng.normal(45, 5, size=shape)
+    errors = rng.poisson(0.4, size=shape)
+    # Simulate gradual battery drain. The level stays a whole number, so each day's drain
+    # effectively rounds up; once empty it stays at 0.
+    battery = np.maximum(0, starting_battery - np.cumsum(np.ceil(drain).astype(np.int64), axis=0))
+    days_back = [today - timedelta(days=d) for d in range(days, 0, -1)]
+
+    return pd.DataFrame({
+        "date": np.repeat([d.isoformat() for d in days_back], devices),
+        "device_id": np.tile(np.arange(1, devices + 1), days),
+        "temperature_c": np.round(temp, 2).ravel(),
+        "humidity_pct": np.round(humidity, 2).ravel(),
+        "battery_pct": battery.ravel(),
+        "error_count": errors.ravel(),
+        "status": _derive_status(battery, errors).ravel(),
+    }, columns=COLUMNS)
+
+def _arrow_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".arrow"
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    return df.astype(ARROW_DTYPES).assign(date=pd.to_datetime(df["date"]))
+
+def _write_arrow(typed: pd.DataFrame, csv_path: str):
+    # Typed columnar copy for the dashboard, in (device_id, date) order so it can skip its own sort.
+    # Uncompressed Arrow IPC (Feather v2) so the dashboard can memory-map it instead of decoding.
+    typed = typed.sort_values(["device_id", "date"]).reset_index(drop=True)
+    typed.to_feather(_arrow_path(csv_path), compression="uncompressed")
+
+def write_metrics(df: pd.DataFrame, csv_path: str):
+    df = df.sort_values(["device_id", "date"])
+    df.to_csv(csv_path, index=False)
+    # Written after the CSV so the copy is never older
+    _write_arrow(_typed(df), csv_path)
+
+def _read_history(csv_path: str) -> pd.DataFrame:
+    # Typed history from the memory-mapped Arrow copy; the CSV is only parsed if the copy is
+    # missing or older (e.g. the CSV was edited by hand)
+    arrow_path = _arrow_path(csv_path)
+    if os.path.exists(arrow_path) and os.path.getmtime(arrow_path) >= os.path.getmtime(csv_path):
+        with pa.memory_map(arrow_path, "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+    return _typed(pd.read_csv(csv_path))
 
 def append_today(csv_path: str, devices: int):
     today_str = date.today().isoformat()
     if os.path.exists(csv_path):
-        df = pd.read_csv(csv_path)
+        history = _read_history(csv_path)
         # For each device, find last battery to continue draining realistically
-        last_battery = df.sort_values(["device_id", "date"]).groupby("device_id").tail(1).set_index("device_id")["battery_pct"]
+        last_battery = history.sort_values(["device_id", "date"]).groupby("device_id").tail(1).set_index("device_id")["battery_pct"]
     else:
-        df = pd.DataFrame(columns=COLUMNS)
+        history = None
         last_battery = pd.Series({i: rng.integers(70, 101) for i in range(1, devices + 1)})
 
-    new_rows = []
-    for dev in range(1, devices + 1):
-        prev_batt = last_battery.get(dev, rng.integers(65, 101))
-        drain = rng.uniform(0.8, 3.0)
-        battery = max(0, prev_batt - drain)
-        temp = rng.normal(25, 3)
-        humidity = rng.normal(45, 5)
-        errors = rng.poisson(0.5)
-        status = _derive_status(battery, errors)
-        new_rows.append({
-            "date": today_str,
-            "device_id": dev,
-            "temperature_c": round(temp, 2),
-            "humidity_pct": round(humidity, 2),
-            "battery_pct": round(battery, 1),
-            "error_count": int(errors),
-            "status": status
-        })
-
-    new_df = pd.DataFrame(new_rows)
-
-    # Prevent duplicate day rows per device (idempotent)
-    df = df[~((df["date"] == today_str))]
-    full = pd.concat([df, new_df], ignore_index=True).sort_values(["device_id", "date"]) 
-    full.to_csv(csv_path, index=False)
-    print(f"Appended {len(new_rows)} rows for {today_str} to {csv_path}")
+    ids = np.arange(1, devices + 1)
+    prev_batt = last_battery.reindex(ids).to_numpy(dtype=float)
+    # Devices without history start somewhere between 65-100
+    no_history = np.isnan(prev_batt)
+    prev_batt[no_history] = rng.integers(65, 101, size=int(no_history.sum()))
+    battery = np.maximum(0, prev_batt - rng.uniform(0.8, 3.0, size=devices))
+    errors = rng.poisson(0.5, size=devices)
+
+    new_df = pd.DataFrame({
+        "date": today_str,
+        "device_id": ids,
+        "temperature_c": np.round(rng.normal(25, 3, size=devices), 2),
+        "humidity_pct": np.round(rng.normal(45, 5, size=devices), 2),
+        "battery_pct": np.round(battery, 1),
+        "error_count": errors,
+        "status": _derive_status(battery, errors),
+    }, columns=COLUMNS)
+
+    if history is not None and not (history["date"] == pd.Timestamp(today_str)).any():
+        # Usual daily run: only today's rows are written to the CSV, the history there is left untouched
+        with open(csv_path, "a", newline="", buffering=1 << 20) as fh:
+            csv.writer(fh, lineterminator=os.linesep).writerows(new_df.itertuples(index=False, name=None))
+            # The batch leaves the 1 MiB buffer in one write; a single fsync lands it before the Arrow copy
+            fh.flush()
+            os.fsync(fh.fileno())
+        _write_arrow(pd.concat([history, _typed(new_df)], ignore_index=True), csv_path)
+    else:
+        # Re-run on the same day: drop today's rows and rewrite from the CSV (idempotent)
+        df = pd.read_csv(csv_path) if history is not None else pd.DataFrame(columns=COLUMNS)
+        df = df[~((df["date"] == today_str))]
+        write_metrics(pd.concat([df, new_df], ignore_index=True), csv_path)
+    print(f"Appended {len(new_df)} rows for {today_str} to {csv_path}")
 
 
 def ensure_csv(csv_path: str, days: int, devices: int):
@@ -102,7 +133,7 @@ def ensure_csv(csv_path: str, days: int, devices: int):
         return
     print(f"Generating initial history: days={days}, devices={devices}")
     hist = generate_initial_history(days=days, devices=devices)
-    hist.to_csv(csv_path, index=False)
+    write_metrics(hist, csv_path)
     print(f"Created {csv_path} with {len(hist)} rows")
 
 